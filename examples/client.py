@@ -1,31 +1,48 @@
-import sys
+import argparse
+import struct
 from io import BytesIO
+import numpy as np  # pip install numpy
 from PIL import Image  # pip install pillow
 import local_comm as lc
 
+# 12-byte header (height, width, channels) followed by the uint8 pixels
+RAW_HDR = struct.Struct("!III")
+
 
 def main():
-    if len(sys.argv) != 3:
-        print(f"Usage: {sys.argv[0]} INPUT_FILENAME OUTPUT_FILENAME")
-        sys.exit(2)
+    parser = argparse.ArgumentParser(description="Invert an image via local_comm")
+    parser.add_argument("input_path", metavar="INPUT_FILENAME")
+    parser.add_argument("output_path", metavar="OUTPUT_FILENAME")
+    parser.add_argument("--png", action="store_true",
+                        help="send PNG bytes instead of raw pixels (slower)")
+    args = parser.parse_args()
 
-    input_path, output_path = sys.argv[1], sys.argv[2]
     ep = lc.EndPoint()
     srv = ep.create_service_caller("invert_image")
-
-    # Load image -> PNG bytes
-    img = Image.open(input_path).convert("RGB")
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    data_in = buf.getvalue()
+    img = Image.open(args.input_path).convert("RGB")
+
+    if args.png:
+        # Load image -> PNG bytes
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+        data_in = buf.getvalue()
+    else:
+        # Load image -> header + raw RGB bytes
+        arr = np.ascontiguousarray(img, dtype=np.uint8)
+        data_in = RAW_HDR.pack(*arr.shape) + arr.tobytes()
 
     print(f"[client] Sending {len(data_in)/1e6:.2f} MB image...")
     data_out = srv.call(data_in)
 
     # Save response
-    out_img = Image.open(BytesIO(data_out))
-    out_img.save(output_path)
-    print(f"[client] Wrote inverted image to {output_path}")
+    if args.png:
+        out_img = Image.open(BytesIO(data_out))
+    else:
+        shape = RAW_HDR.unpack_from(data_out)
+        pixels = np.frombuffer(data_out, np.uint8, offset=RAW_HDR.size)
+        out_img = Image.fromarray(pixels.reshape(shape))
+    out_img.save(args.output_path)
+    print(f"[client] Wrote inverted image to {args.output_path}")
 
 
 if __name__ == "__main__":
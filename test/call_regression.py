@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Regression checks for a caller's persistent connection:
+
+- a call interrupted while waiting for its reply must not leave that reply
+  to be read by the next call;
+- call_mv() on a caller nobody else references must not hang.
+"""
+import contextlib
+import os
+import random
+import signal
+import sys
+import time
+from multiprocessing import Process
+
+# Ensure we can import local_comm.py from the same directory
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+import local_comm as lc  # noqa
+
+# Inline-sized and shm-sized payloads
+SIZES = [16, 1024 * 1024]
+
+
+def _service_proc(service_name: str):
+    def callback(data_in: bytes) -> bytes:
+        if data_in == b"slow":
+            time.sleep(0.5)
+        return data_in
+
+    ep = lc.EndPoint()
+    ep.create_service(service_name, callback)
+    ep.spin()
+
+
+class _Alarm(BaseException):
+    """Stands in for KeyboardInterrupt, which call() does not wrap either."""
+
+
+@contextlib.contextmanager
+def _alarm_after(seconds: float):
+    """Raise _Alarm in the main thread once ``seconds`` have passed."""
+    def handler(signum, frame):
+        raise _Alarm
+
+    old = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old)
+
+
+def check_interrupted_call(service_name: str):
+    client = lc.EndPoint().create_service_caller(service_name)
+    client.call(b"warm-up", timeout=5.0)
+    for _ in range(2):
+        try:
+            with _alarm_after(0.1):
+                client.call(b"slow")
+            raise AssertionError("call(b'slow') was not interrupted")
+        except _Alarm:
+            pass
+        # the reply to b"slow" must not be taken for this one
+        assert client.call(b"fast", timeout=5.0) == b"fast"
+        for n in SIZES:
+            payload = os.urandom(n)
+            assert client.call(payload, timeout=5.0) == payload, n
+    client.close()
+    print("  interrupted call(): ok")
+
+
+def check_temporary_caller_call_mv(service_name: str):
+    ep = lc.EndPoint()
+    for n in SIZES:
+        payload = os.urandom(n)
+        t0 = time.perf_counter()
+        try:
+            with _alarm_after(5.0):
+                with ep.create_service_caller(service_name).call_mv(payload) as mv:
+                    assert mv == payload, n
+        except _Alarm:
+            pass
+        # the hang was in the caller's __del__, which swallows the alarm: time it
+        assert time.perf_counter() - t0 < 5.0, f"call_mv() hung ({n} bytes)"
+    print("  call_mv() on a temporary caller: ok")
+
+
+def main():
+    service_name = f"local_comm_regression_{random.randint(1, 1_000_000)}"
+    srv = Process(target=_service_proc, args=(service_name,), daemon=True)
+    srv.start()
+
+    print("== Caller regressions:")
+    try:
+        check_interrupted_call(service_name)
+        check_temporary_caller_call_mv(service_name)
+    finally:
+        # Interrupt so the server cleans up its socket and shared memory
+        os.kill(srv.pid, signal.SIGINT)
+        srv.join(timeout=5.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Check that EndPoint(legacy=True) still talks to peers running the original
+length-prefixed JSON protocol, in both directions.
+
+The original peer is reimplemented below as it was before the binary header:
+one connection per call, a fresh input segment per request and a fresh output
+segment per reply, which the client unlinks.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+# Ensure we can import local_comm.py from the same directory
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+import local_comm as lc  # noqa
+
+# Below and above the 64 KiB inline threshold of the binary protocol
+SIZES = [16, 1000, 64 * 1024 - 1, 64 * 1024, 1024 * 1024]
+
+
+# ---------- the original JSON framing ----------
+def _send_json(sock, obj):
+    data = json.dumps(obj).encode("utf-8")
+    sock.sendall(struct.pack("!I", len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _recv_json(sock):
+    hdr = _recv_exact(sock, 4)
+    if not hdr:
+        return None
+    (n,) = struct.unpack("!I", hdr)
+    return json.loads(_recv_exact(sock, n).decode("utf-8"))
+
+
+def _sock_path(service_name):
+    safe = "".join(ch if ch.isalnum() or ch in "._-" else "_" for ch in service_name)
+    return f"/tmp/local_comm_{safe}.sock"
+
+
+def json_call(service_name, data_in, connect_timeout=2.0):
+    """A call as the original client made it."""
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            s.connect(_sock_path(service_name))
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.time() > deadline:
+                s.close()
+                raise
+            time.sleep(0.02)
+
+    in_shm = shared_memory.SharedMemory(create=True, size=len(data_in))
+    in_shm.buf[: len(data_in)] = data_in
+    try:
+        with s:
+            _send_json(s, {"op": "process", "shm": in_shm.name, "size": len(data_in)})
+            resp = _recv_json(s)
+            assert resp and resp.get("ok"), resp
+            out_shm = shared_memory.SharedMemory(name=resp["out_shm"])
+            try:
+                return bytes(out_shm.buf[: int(resp["out_size"])])
+            finally:
+                out_shm.close()
+                out_shm.unlink()  # the client owns the reply segment
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+
+
+def serve_json(service_name):
+    """A server as the original EndPoint ran it: reply with the reversed request."""
+    path = _sock_path(service_name)
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(path)
+    srv.listen(64)
+    try:
+        while True:
+            conn, _ = srv.accept()
+            with conn:
+                req = _recv_json(conn)
+                if req is None:
+                    continue
+                assert req.get("op") == "process", req
+                in_shm = shared_memory.SharedMemory(name=req["shm"])
+                req_bytes = bytes(in_shm.buf[: int(req["size"])])
+                in_shm.close()
+                resource_tracker.unregister(in_shm._name, "shared_memory")
+                out_bytes = req_bytes[::-1]
+                out_shm = shared_memory.SharedMemory(create=True, size=len(out_bytes))
+                out_shm.buf[: len(out_bytes)] = out_bytes
+                _send_json(
+                    conn, {"ok": True, "out_shm": out_shm.name, "out_size": len(out_bytes)}
+                )
+                out_shm.close()
+                resource_tracker.unregister(out_shm._name, "shared_memory")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        os.unlink(path)
+
+
+# ---------- the current EndPoint in legacy mode ----------
+def serve(service_name, zero_copy):
+    def callback(data_in):
+        return data_in[::-1]
+
+    def callback_zero_copy(data_in, out_buf):
+        out_buf(len(data_in))[:] = data_in[::-1]
+
+    ep = lc.EndPoint(legacy=True)
+    if zero_copy:
+        ep.create_service(service_name, callback_zero_copy, zero_copy=True)
+    else:
+        ep.create_service(service_name, callback)
+    ep.spin()
+
+
+def _start(*args):
+    # A separate interpreter, like a real peer: sharing a resource tracker with
+    # the client would make it see each segment unregistered twice.
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), *args])
+
+
+def _stop(proc):
+    # Interrupt so the server cleans up its socket and shared memory
+    proc.send_signal(signal.SIGINT)
+    assert proc.wait(timeout=5.0) == 0, proc.returncode
+
+
+def json_client_to_legacy_server(zero_copy):
+    name = f"local_comm_legacy_{random.randint(1, 1_000_000)}"
+    srv = _start("--serve", name, *(["--zero-copy"] if zero_copy else []))
+    try:
+        for n in SIZES:
+            payload = os.urandom(n)
+            assert json_call(name, payload) == payload[::-1], n
+    finally:
+        _stop(srv)
+    print(f"  JSON client -> EndPoint(legacy=True) server, zero_copy={zero_copy}: ok")
+
+
+def legacy_client_to_json_server(call_mv):
+    name = f"local_comm_legacy_{random.randint(1, 1_000_000)}"
+    srv = _start("--serve-json", name)
+    client = lc.EndPoint(legacy=True).create_service_caller(name)
+    try:
+        for n in SIZES:
+            payload = os.urandom(n)
+            if call_mv:
+                with client.call_mv(payload, timeout=5.0) as mv:
+                    assert mv == payload[::-1], n
+            else:
+                assert client.call(payload, timeout=5.0) == payload[::-1], n
+        client.close()
+    finally:
+        _stop(srv)
+    print(f"  EndPoint(legacy=True) client -> JSON server, call_mv={call_mv}: ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local_comm legacy protocol interop check")
+    parser.add_argument("--serve", metavar="SERVICE",
+                        help="internal: run an EndPoint(legacy=True) echo server")
+    parser.add_argument("--serve-json", metavar="SERVICE",
+                        help="internal: run an original JSON protocol echo server")
+    parser.add_argument("--zero-copy", action="store_true")
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args.serve, args.zero_copy)
+    if args.serve_json:
+        return serve_json(args.serve_json)
+
+    print("== Legacy JSON protocol interop:")
+    for zero_copy in (False, True):
+        json_client_to_legacy_server(zero_copy)
+    for call_mv in (False, True):
+        legacy_client_to_json_server(call_mv)
+
+
+if __name__ == "__main__":
+    main()
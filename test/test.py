@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import os
 import random
 import signal
@@ -13,14 +14,21 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 import local_comm as lc  # noqa
 
 
-def _service_proc(service_name: str):
+def _service_proc(service_name: str, zero_copy: bool = False, workers: int = 0):
     """Server process: echo bytes back (minimal processing)."""
     def callback(data_in: bytes) -> bytes:
         # Do minimal work to simulate a hop; you can add real processing here.
         return data_in
 
-    ep = lc.EndPoint()
-    ep.create_service(service_name, callback)
+    def callback_zero_copy(data_in: memoryview, out_buf) -> None:
+        # Copy straight from the request segment into the reply segment.
+        out_buf(len(data_in))[:] = data_in
+
+    ep = lc.EndPoint(workers=workers)
+    if zero_copy:
+        ep.create_service(service_name, callback_zero_copy, zero_copy=True)
+    else:
+        ep.create_service(service_name, callback)
     try:
         ep.spin()
     except KeyboardInterrupt:
@@ -39,18 +47,23 @@ def _percentiles(samples, ps=(50, 95, 99)):
     return out
 
 
+def _call_mv(client, payload, timeout):
+    """Round trip that reads the reply in place (no copy out of shared memory)."""
+    with client.call_mv(payload, timeout=timeout) as mv:
+        return len(mv)
+
+
 def human_mb(nbytes):
     return nbytes / (1024.0 * 1024.0)
 
 
-def run_bench(service_name: str, sizes, iters: int, file_path: str = None, connect_timeout: float = 2.0):
+def run_bench(service_name: str, sizes, iters: int, file_path: str = None, connect_timeout: float = 2.0,
+              zero_copy: bool = False, workers: int = 0, call_mv: bool = False):
     # Start server in a separate process
-    srv = Process(target=_service_proc, args=(service_name,), daemon=True)
+    srv = Process(target=_service_proc, args=(service_name, zero_copy, workers), daemon=True)
     srv.start()
 
-    # Give the server a moment to create the socket
-    time.sleep(0.15)
-
+    # No need to wait for the server: connecting waits for its socket to appear
     ep = lc.EndPoint()
     client = ep.create_service_caller(service_name)
 
@@ -59,6 +72,11 @@ def run_bench(service_name: str, sizes, iters: int, file_path: str = None, conne
         payload = os.urandom(1024)
         client.call(payload, timeout=5.0)
 
+    if call_mv:
+        roundtrip = functools.partial(_call_mv, client)
+    else:
+        roundtrip = client.call
+
     results = []
 
     if file_path:
@@ -67,7 +85,7 @@ def run_bench(service_name: str, sizes, iters: int, file_path: str = None, conne
         lat = []
         for _ in range(iters):
             t0 = time.perf_counter()
-            _ = client.call(data, timeout=10.0)
+            _ = roundtrip(data, timeout=10.0)
             lat.append(time.perf_counter() - t0)
         pct = _percentiles(lat)
         size_mb = human_mb(len(data))
@@ -84,7 +102,7 @@ def run_bench(service_name: str, sizes, iters: int, file_path: str = None, conne
         print(f"  {w}x{h}x{c}  ({human_mb(nbytes):.2f} MiB), iters={iters} ... ", end="", flush=True)
         for _ in range(iters):
             t0 = time.perf_counter()
-            _ = client.call(payload, timeout=10.0)
+            _ = roundtrip(payload, timeout=10.0)
             lat.append(time.perf_counter() - t0)
         pct = _percentiles(lat)
         size_mb = human_mb(nbytes)
@@ -92,14 +110,18 @@ def run_bench(service_name: str, sizes, iters: int, file_path: str = None, conne
               f"p95={pct[95]*1000:.2f} ms | p99={pct[99]*1000:.2f} ms | "
               f"thrpt≈{(size_mb/mean(lat)):.2f} MiB/s")
 
+    # Release cached shared memory on both sides before stopping the server
+    client.close()
+
     # Cleanup server
     if srv.is_alive():
-        # Terminate the process; EndPoint.spin() will clean sockets on exit
-        srv.terminate()
-        try:
+        # Interrupt rather than terminate: spin() then closes the endpoint,
+        # removing its socket and unlinking its pooled shared memory
+        os.kill(srv.pid, signal.SIGINT)
+        srv.join(timeout=5.0)
+        if srv.is_alive():
+            srv.terminate()
             srv.join(timeout=1.0)
-        except Exception:
-            pass
 
 
 def parse_size(arg):
@@ -120,6 +142,12 @@ def main():
                         default=[(640, 480, 3), (1280, 720, 3), (1920, 1080, 3)],
                         help="sizes like 640x480x3 1280x720x3")
     parser.add_argument("--file", help="optional: benchmark this file's bytes (e.g., PNG/JPEG)")
+    parser.add_argument("--zero-copy", action="store_true",
+                        help="serve with a zero-copy (memoryview) callback")
+    parser.add_argument("--call-mv", action="store_true",
+                        help="read replies in place with call_mv() instead of call()")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run server callbacks on this many worker threads")
     args = parser.parse_args()
 
     print(f"Service: {args.service}")
@@ -128,7 +156,8 @@ def main():
     if args.file:
         print(f"File:    {args.file}")
 
-    run_bench(args.service, args.sizes, args.iters, file_path=args.file)
+    run_bench(args.service, args.sizes, args.iters, file_path=args.file, zero_copy=args.zero_copy,
+              workers=args.workers, call_mv=args.call_mv)
 
 
 if __name__ == "__main__":